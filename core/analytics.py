@@ -1,5 +1,11 @@
+import threading
+import warnings
+
+import numpy as np
 import pandas as pd
 
+from core.utils import CORR_METHODS, get_numeric_columns, get_categorical_columns
+
 
 def dataset_overview(df):
     return {
@@ -89,6 +95,335 @@ def compare_columns(df, c1, c2):
     
     return result
 
+CORR_BLOCK_SIZE = 256
+# Upper bound on n x columns for the temporaries of the blocked kernels
+# (Spearman re-rank chunks, Cramér's V one-hot blocks)
+CORR_CHUNK_CELLS = 1 << 20
+# Columns with more distinct values than this (IDs, names, emails...) are left
+# out of Cramér's V: the result is meaningless for them and the tables explode.
+CRAMERS_V_MAX_CATEGORIES = 50
+
+# Association matrices keyed by (dataset key, columns, method), so replays and
+# follow-up pair lookups on the same CSV don't recompute the whole matrix.
+# Callers that already know which upload they're on should pass a cheap `key`
+# (e.g. file id + shape); otherwise the columns are hashed on every call.
+# Streamlit sessions run in separate threads and share this module, so every
+# read and write goes through _ASSOC_LOCK.
+_ASSOC_CACHE = {}
+_ASSOC_CACHE_LIMIT = 8
+_ASSOC_LOCK = threading.Lock()
+
+
+def _cache_key(df, columns, method, key=None):
+    if key is None and columns:
+        key = (len(df), int(pd.util.hash_pandas_object(df[columns], index=False).sum()))
+    return (key, tuple(columns), method)
+
+
+def _cached(key, compute):
+    # Returns the cached object itself; public functions hand out copies
+    with _ASSOC_LOCK:
+        if key in _ASSOC_CACHE:
+            return _ASSOC_CACHE[key]
+
+    # Compute outside the lock so one slow matrix doesn't block other sessions;
+    # if two threads race on the same key, the first result wins.
+    value = compute()
+    with _ASSOC_LOCK:
+        if key not in _ASSOC_CACHE:
+            while len(_ASSOC_CACHE) >= _ASSOC_CACHE_LIMIT:
+                _ASSOC_CACHE.pop(next(iter(_ASSOC_CACHE)))
+            _ASSOC_CACHE[key] = value
+        return _ASSOC_CACHE[key]
+
+
+def _masked_corr(values, block=CORR_BLOCK_SIZE):
+    """
+    Pairwise-complete Pearson correlation of the columns of `values`,
+    computed block by block with NaNs masked out of every sum.
+    """
+    mask = ~np.isnan(values)
+    m = mask.astype(float)
+    # Centre each column first to keep the sum-of-squares terms stable
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        x = np.where(mask, values - np.nanmean(values, axis=0), 0.0)
+    x2 = x * x
+
+    p = values.shape[1]
+    out = np.full((p, p), np.nan)
+    for i in range(0, p, block):
+        bi = slice(i, i + block)
+        for j in range(i, p, block):
+            bj = slice(j, j + block)
+            n = m[:, bi].T @ m[:, bj]
+            sx = x[:, bi].T @ m[:, bj]
+            sy = m[:, bi].T @ x[:, bj]
+            sxy = x[:, bi].T @ x[:, bj]
+            sxx = x2[:, bi].T @ m[:, bj]
+            syy = m[:, bi].T @ x2[:, bj]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                cov = sxy - sx * sy / n
+                var = (sxx - sx * sx / n) * (syy - sy * sy / n)
+                r = cov / np.sqrt(var)
+            r[(n < 2) | ~(var > 0)] = np.nan
+            r = np.clip(r, -1.0, 1.0)
+            out[bi, bj] = r
+            out[bj, bi] = r.T
+    return out
+
+
+def _paired_corr(a, b, keep):
+    """
+    Pearson correlation of a[:, k] with b[:, k] for every k, over the rows
+    where keep[:, k] is set. `a` and `b` hold ranks, so each mean is (n + 1) / 2.
+    """
+    n = keep.sum(axis=0)
+    mean = (n + 1) / 2
+    a = np.where(keep, a - mean, 0.0)
+    b = np.where(keep, b - mean, 0.0)
+    var = (a * a).sum(axis=0) * (b * b).sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = (a * b).sum(axis=0) / np.sqrt(var)
+    r[(n < 2) | ~(var > 0)] = np.nan
+    return np.clip(r, -1.0, 1.0)
+
+
+def _tie_bounds(new_group):
+    """
+    For each sorted position, the first and last sorted position of its run
+    of tied values. `new_group` flags the first value of each run.
+    """
+    n = len(new_group)
+    pos = np.arange(n).reshape((n,) + (1,) * (new_group.ndim - 1))
+    ends = np.ones_like(new_group)
+    ends[:-1] = new_group[1:]
+    first = np.maximum.accumulate(np.where(new_group, pos, 0), axis=0)
+    last = np.minimum.accumulate(np.where(ends, pos, n - 1)[::-1], axis=0)[::-1]
+    return first, last
+
+
+def _ranks_within(order, keep, bounds=None):
+    """
+    Average ranks of each column counting only the rows where `keep` is set;
+    rows outside `keep` get meaningless values. `order` is the sort order,
+    either one column shared by every mask in `keep` or one per column, and
+    `bounds` the tie runs from _tie_bounds (None when there are no ties).
+    """
+    shared = order.ndim == 1
+    kept = keep[order] if shared else np.take_along_axis(keep, order, axis=0)
+    counts = np.cumsum(kept, axis=0)
+    if bounds is None:
+        ranks_sorted = counts
+    else:
+        first, last = bounds
+        counts = np.concatenate([np.zeros((1, keep.shape[1]), counts.dtype), counts])
+        if shared:
+            before, upto = counts[first], counts[last + 1]
+        else:
+            before = np.take_along_axis(counts, first, axis=0)
+            upto = np.take_along_axis(counts, last + 1, axis=0)
+        ranks_sorted = before + (upto - before + 1) / 2
+
+    ranks = np.empty(keep.shape)
+    if shared:
+        ranks[order] = ranks_sorted
+    else:
+        np.put_along_axis(ranks, order, ranks_sorted, axis=0)
+    return ranks
+
+
+def _masked_spearman(values, block=CORR_BLOCK_SIZE):
+    """
+    Pairwise-complete Spearman correlation. Columns sharing the same null
+    pattern are ranked once and go through the Pearson kernel; pairs whose
+    null patterns differ are re-ranked on their common rows, like pandas does,
+    a chunk of at most `block` (and CORR_CHUNK_CELLS / n) columns at a time.
+    """
+    n, p = values.shape
+    out = _masked_corr(pd.DataFrame(values).rank().to_numpy(), block)
+    if n == 0:
+        return out
+
+    mask = ~np.isnan(values)
+    _, pattern = np.unique(mask.T, axis=0, return_inverse=True)
+    pattern = pattern.ravel()
+
+    # Sort every column once; NaNs sort last and are never kept
+    order = np.argsort(values, axis=0, kind="stable")
+    ordered = np.take_along_axis(values, order, axis=0)
+    new_group = np.ones(values.shape, dtype=bool)
+    new_group[1:] = ordered[1:] != ordered[:-1]
+    del ordered
+    tied = ~new_group.all(axis=0)
+
+    chunk = max(1, min(block, CORR_CHUNK_CELLS // n))
+    for i in range(p):
+        bounds_i = _tie_bounds(new_group[:, i]) if tied[i] else None
+        others = np.flatnonzero(pattern[i + 1:] != pattern[i]) + i + 1
+        # Tie-free columns take the cheap path, so keep them in their own chunks
+        for group in (others[~tied[others]], others[tied[others]]):
+            for c in range(0, len(group), chunk):
+                js = group[c:c + chunk]
+                keep = mask[:, [i]] & mask[:, js]
+                a = _ranks_within(order[:, i], keep, bounds_i)
+                bounds = _tie_bounds(new_group[:, js]) if tied[js[0]] else None
+                b = _ranks_within(order[:, js], keep, bounds)
+                out[i, js] = out[js, i] = _paired_corr(a, b, keep)
+    return out
+
+
+def _check_method(method):
+    if method not in CORR_METHODS:
+        raise ValueError(f"⚠️ Unknown method '{method}'. Use one of: {', '.join(CORR_METHODS)}")
+
+
+def _correlation(df, method, key=None):
+    cols = get_numeric_columns(df)
+
+    def compute():
+        values = df[cols].astype(float).to_numpy()
+        kernel = _masked_spearman if method == "spearman" else _masked_corr
+        return pd.DataFrame(kernel(values), index=cols, columns=cols)
+
+    return _cached(_cache_key(df, cols, method, key), compute)
+
+
+def _cramers_v_table(table):
+    """
+    Cramér's V of a contingency table; levels that never occur are ignored.
+    """
+    rows, cols = table.sum(axis=1), table.sum(axis=0)
+    n = rows.sum()
+    k = min(np.count_nonzero(rows), np.count_nonzero(cols))
+    if k < 2:
+        return np.nan
+    # Only observed cells are needed:
+    # sum((O - E)^2 / E) over all cells == sum(O^2 / E) over observed - n
+    seen = table > 0
+    expected = np.outer(rows, cols)[seen] / n
+    chi2 = (table[seen] ** 2 / expected).sum() - n
+    return np.sqrt(max(chi2, 0.0) / n / (k - 1))
+
+
+def _one_hot(codes, sizes):
+    """
+    n x sum(sizes) indicator matrix of several factorized columns side by
+    side, with all-zero rows where a column is null. Returns it and the
+    offset of each column's block of levels.
+    """
+    n = len(codes[0])
+    offsets = np.r_[0, np.cumsum(sizes)[:-1]]
+    # float32 sums of 0/1 stay exact below 2**24 rows and halve the memory
+    out = np.zeros((n, sum(sizes)), dtype=np.float32 if n < 1 << 24 else np.float64)
+    for code, offset in zip(codes, offsets):
+        rows = np.flatnonzero(code >= 0)
+        out[rows, offset + code[rows]] = 1.0
+    return out, offsets
+
+
+def _cramers_v(df, key=None):
+    cols = get_categorical_columns(df)
+
+    def compute():
+        n, p = len(df), len(cols)
+        out = np.full((p, p), np.nan)
+        codes = [pd.factorize(df[c])[0] for c in cols]
+        sizes = [code.max(initial=-1) + 1 for code in codes]
+        usable = [i for i in range(p) if 0 < sizes[i] <= CRAMERS_V_MAX_CATEGORIES]
+
+        # Group columns so each one-hot block stays within CORR_CHUNK_CELLS
+        budget = max(1, CORR_CHUNK_CELLS // max(n, 1))
+        blocks, width = [], budget
+        for i in usable:
+            if width + sizes[i] > budget or len(blocks[-1]) >= CORR_BLOCK_SIZE:
+                blocks.append([])
+                width = 0
+            blocks[-1].append(i)
+            width += sizes[i]
+
+        # Every pair's contingency table is a slice of one block product
+        for bi, block_i in enumerate(blocks):
+            hot_i, off_i = _one_hot([codes[i] for i in block_i], [sizes[i] for i in block_i])
+            for block_j in blocks[bi:]:
+                if block_j is block_i:
+                    hot_j, off_j = hot_i, off_i
+                else:
+                    hot_j, off_j = _one_hot([codes[j] for j in block_j], [sizes[j] for j in block_j])
+                tables = (hot_i.T @ hot_j).astype(np.float64)
+                for a, i in enumerate(block_i):
+                    for b, j in enumerate(block_j):
+                        table = tables[off_i[a]:off_i[a] + sizes[i], off_j[b]:off_j[b] + sizes[j]]
+                        out[i, j] = out[j, i] = _cramers_v_table(table)
+        return pd.DataFrame(out, index=cols, columns=cols)
+
+    return _cached(_cache_key(df, cols, "cramers_v", key), compute)
+
+
+def correlation_matrix(df, method="pearson", key=None):
+    """
+    Correlation between every pair of numeric columns (nulls ignored pairwise).
+    """
+    _check_method(method)
+    return _correlation(df, method, key).copy()
+
+
+def cramers_v_matrix(df, key=None):
+    """
+    Cramér's V between every pair of categorical columns (nulls ignored pairwise).
+    Columns with more than CRAMERS_V_MAX_CATEGORIES distinct values are left as NaN.
+    """
+    return _cramers_v(df, key).copy()
+
+
+def correlate_pair(df, c1, c2, method="pearson", key=None):
+    _check_method(method)
+    for c in (c1, c2):
+        if c not in df.columns:
+            raise ValueError(f"⚠️ Column '{c}' not found.")
+
+    numeric = get_numeric_columns(df)
+    categorical = get_categorical_columns(df)
+
+    if c1 in numeric and c2 in numeric:
+        value = _correlation(df, method, key).loc[c1, c2]
+    elif c1 in categorical and c2 in categorical:
+        method = "cramers_v"
+        value = _cramers_v(df, key).loc[c1, c2]
+    else:
+        raise ValueError("⚠️ Both columns must be numeric, or both categorical.")
+
+    return {
+        "columns": [c1, c2],
+        "method": method,
+        "value": None if pd.isna(value) else round(float(value), 4),
+    }
+
+
+def compare_all(df, method="pearson", key=None):
+    """
+    Ranks every numeric pair by |correlation| and every categorical pair by Cramér's V.
+    """
+    _check_method(method)
+    frames = []
+    for matrix, name in (
+        (_correlation(df, method, key), method),
+        (_cramers_v(df, key), "cramers_v"),
+    ):
+        cols = list(matrix.columns)
+        i, j = np.triu_indices(len(cols), k=1)
+        values = matrix.to_numpy()[i, j]
+        frames.append(pd.DataFrame({
+            "column_1": np.array(cols, dtype=object)[i],
+            "column_2": np.array(cols, dtype=object)[j],
+            "method": name,
+            "value": values,
+        }))
+
+    result = pd.concat(frames, ignore_index=True).dropna(subset=["value"])
+    order = result["value"].abs().sort_values(ascending=False).index
+    return result.loc[order].reset_index(drop=True).round({"value": 4})
+
 def filter_dataset(df, query):
     """
     Filters the dataframe using a pandas query string.
@@ -1,5 +1,7 @@
 import re
 
+from core.utils import CORR_METHODS
+
 HELP_TEXT = """
 ### 🧙 Data Alchemist – Chatbot Commands
 
@@ -12,6 +14,9 @@ top <column> 10
 groupby <group_col> <agg> <value_col>
 outliers <column>
 compare <col1> <col2>
+compare all [pearson|spearman]
+corr [pearson|spearman]
+corr <col1> <col2> [pearson|spearman]
 
 plot <x> <y>
 hist <column>
@@ -39,6 +44,8 @@ def normalize(cmd):
         "groupby": "groupby",
         "outliers": "outliers",
         "compare": "compare",
+        "corr": "corr",
+        "correlation": "corr",
         "insights": "insights",
         "plot": "plot",
         "hist": "hist",
@@ -103,12 +110,30 @@ def parse_command(text):
         return {"kind": "action", "command": "outliers", "args": {"column": col}}
 
     if cmd == "compare":
+        # "compare all [method]" only; a column called "all" still compares normally
+        method = get_arg(2, "pearson").lower()
+        if get_arg(1, "").lower() == "all" and len(parts) <= 3 and method in CORR_METHODS:
+            return {"kind": "action", "command": "compare_all", "args": {"method": method}}
         if len(parts) < 3: return {"kind": "text", "content": "⚠️ Usage: `compare <col1> <col2>`"}
         return {
             "kind": "action",
             "command": "compare",
             "args": {"c1": parts[1], "c2": parts[2]},
         }
+
+    if cmd == "corr":
+        usage = "⚠️ Usage: `corr [pearson|spearman]` or `corr <col1> <col2> [pearson|spearman]`"
+        if len(parts) <= 2:
+            method = get_arg(1, "pearson").lower()
+            if method not in CORR_METHODS: return {"kind": "text", "content": usage}
+            return {"kind": "action", "command": "corr", "args": {"method": method}}
+        method = get_arg(3, "pearson").lower()
+        if len(parts) > 4 or method not in CORR_METHODS: return {"kind": "text", "content": usage}
+        return {
+            "kind": "action",
+            "command": "corr_pair",
+            "args": {"c1": parts[1], "c2": parts[2], "method": method},
+        }
         
     if cmd == "filter":
         # Everything after "filter" is the query
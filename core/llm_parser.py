@@ -21,8 +21,11 @@ Available Commands:
 5. {"kind": "action", "command": "groupby", "args": {"group": "<col_name>", "agg": "<sum|mean|count>", "value": "<col_name>"}}
 6. {"kind": "action", "command": "outliers", "args": {"column": "<col_name>"}}
 7. {"kind": "action", "command": "compare", "args": {"c1": "<col_name>", "c2": "<col_name>"}}
-8. {"kind": "plot", "command": "plot", "args": {"x": "<col_name>", "y": "<col_name>"}}
-9. {"kind": "plot", "command": "hist", "args": {"column": "<col_name>"}}
+8. {"kind": "action", "command": "compare_all", "args": {"method": "<pearson|spearman>"}}
+9. {"kind": "action", "command": "corr", "args": {"method": "<pearson|spearman>"}}
+10. {"kind": "action", "command": "corr_pair", "args": {"c1": "<col_name>", "c2": "<col_name>", "method": "<pearson|spearman>"}}
+11. {"kind": "plot", "command": "plot", "args": {"x": "<col_name>", "y": "<col_name>"}}
+12. {"kind": "plot", "command": "hist", "args": {"column": "<col_name>"}}
 
 Examples:
 - "Show 5 rows": {"kind": "action", "command": "head", "args": {"n": 5}}
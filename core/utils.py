@@ -1,3 +1,6 @@
+CORR_METHODS = ("pearson", "spearman")
+
+
 def get_numeric_columns(df):
     return df.select_dtypes(include="number").columns.tolist()
 
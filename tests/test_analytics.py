@@ -0,0 +1,136 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import analytics
+from core.analytics import (
+    CORR_BLOCK_SIZE,
+    CRAMERS_V_MAX_CATEGORIES,
+    _masked_corr,
+    _masked_spearman,
+    compare_all,
+    correlate_pair,
+    correlation_matrix,
+    cramers_v_matrix,
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    analytics._ASSOC_CACHE.clear()
+    yield
+    analytics._ASSOC_CACHE.clear()
+
+
+def with_nulls(rows, cols, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.normal(size=(rows, cols)))
+    df = df.mask(rng.random(df.shape) < 0.1)
+    df[cols] = rng.integers(0, 4, rows).astype(float)  # heavy ties
+    df[cols + 1] = 1.0  # constant column -> NaN
+    return df
+
+
+def test_pearson_matches_pandas_across_blocks():
+    df = with_nulls(300, CORR_BLOCK_SIZE + 20)
+    result = _masked_corr(df.to_numpy())
+    expected = df.corr().to_numpy()
+    assert np.array_equal(np.isnan(result), np.isnan(expected))
+    assert np.nanmax(np.abs(result - expected)) < 1e-12
+
+
+def test_spearman_matches_pandas_with_differing_nulls():
+    df = with_nulls(300, 30)
+    # block=7 splits both the Pearson step and the per-pair re-rank into chunks
+    result = _masked_spearman(df.to_numpy(), block=7)
+    expected = df.corr("spearman").to_numpy()
+    assert np.array_equal(np.isnan(result), np.isnan(expected))
+    assert np.nanmax(np.abs(result - expected)) < 1e-12
+
+
+def test_spearman_of_copy_is_one_when_nulls_differ():
+    x = pd.Series(np.random.default_rng(1).normal(size=200))
+    df = pd.DataFrame({"x": x, "y": x.copy()})
+    df.loc[:20, "x"] = np.nan
+    df.loc[30:60, "y"] = np.nan
+    assert correlation_matrix(df, "spearman").loc["x", "y"] == 1.0
+
+
+def test_cramers_v_hand_computed():
+    # 2x2 table [[10, 20], [30, 40]]: chi2 = 0.793651, n = 100
+    a = ["p"] * 30 + ["q"] * 70
+    b = ["u"] * 10 + ["v"] * 20 + ["u"] * 30 + ["v"] * 40
+    df = pd.DataFrame({"a": a, "b": b}, dtype=object)
+    v = cramers_v_matrix(df).loc["a", "b"]
+    assert abs(v - np.sqrt(0.793651 / 100)) < 1e-6
+
+
+def test_cramers_v_skips_high_cardinality_columns():
+    n = CRAMERS_V_MAX_CATEGORIES * 4
+    df = pd.DataFrame({
+        "id": [f"id{i}" for i in range(n)],
+        "group": ["a", "b"] * (n // 2),
+    }, dtype=object)
+    matrix = cramers_v_matrix(df)
+    assert np.isnan(matrix.loc["id", "group"])
+    assert matrix.loc["group", "group"] == 1.0
+
+
+def test_zero_rows():
+    df = pd.read_csv(io.StringIO("name,city,age\n"))
+    assert compare_all(df).empty
+    assert cramers_v_matrix(df).isna().all().all()
+    df = df.assign(score=[]).astype({"age": float, "score": float})
+    assert compare_all(df, "spearman").empty
+
+
+def test_cached_matrix_is_not_shared():
+    df = pd.DataFrame({"x": [1.0, 2.0, 3.0], "y": [1.0, 3.0, 2.0]})
+    matrix = correlation_matrix(df)
+    matrix.iloc[0, 1] = 99.0
+    assert correlation_matrix(df).iloc[0, 1] == 0.5
+
+
+def mixed_frame():
+    x = np.arange(10, dtype=float)
+    return pd.DataFrame({
+        "x": x,
+        "up": x * 2 + 1,                      # r = 1
+        "down": np.tile([0.0, 0.5], 5) - x,   # strongly negative
+        "flat": np.ones(10),                  # constant -> NaN, dropped
+        "colour": ["red", "blue"] * 5,
+        "shade": ["dark", "light"] * 5,       # same split as colour -> V = 1
+        "size": ["s", "s", "m", "m", "l"] * 2,
+    }).astype({"colour": object, "shade": object, "size": object})
+
+
+def test_compare_all_ranks_by_magnitude_and_drops_nan():
+    result = compare_all(mixed_frame())
+    assert list(result.columns) == ["column_1", "column_2", "method", "value"]
+    assert set(result["method"]) == {"pearson", "cramers_v"}
+    assert not result["value"].isna().any()
+    assert "flat" not in set(result["column_1"]) | set(result["column_2"])
+    magnitudes = result["value"].abs().tolist()
+    assert magnitudes == sorted(magnitudes, reverse=True)
+    assert (result["value"] < 0).any()
+
+
+def test_correlate_pair_dispatches_on_dtype():
+    df = mixed_frame()
+    assert correlate_pair(df, "x", "up") == {"columns": ["x", "up"], "method": "pearson", "value": 1.0}
+    assert correlate_pair(df, "x", "up", "spearman")["method"] == "spearman"
+    pair = correlate_pair(df, "colour", "shade")
+    assert pair["method"] == "cramers_v" and pair["value"] == 1.0
+    assert correlate_pair(df, "x", "flat")["value"] is None
+
+
+@pytest.mark.parametrize("c1, c2, method", [
+    ("x", "colour", "pearson"),
+    ("x", "missing", "pearson"),
+    ("colour", "shade", "kendall"),
+])
+def test_correlate_pair_errors(c1, c2, method):
+    with pytest.raises(ValueError):
+        correlate_pair(mixed_frame(), c1, c2, method)
@@ -0,0 +1,28 @@
+import pytest
+
+from core.command_parser import parse_command
+
+
+@pytest.mark.parametrize("text, command, args", [
+    ("compare all", "compare_all", {"method": "pearson"}),
+    ("compare ALL Spearman", "compare_all", {"method": "spearman"}),
+    ("compare All Age", "compare", {"c1": "All", "c2": "Age"}),
+    ("compare all Age Salary", "compare", {"c1": "all", "c2": "Age"}),
+    ("compare Age Salary", "compare", {"c1": "Age", "c2": "Salary"}),
+    ("corr", "corr", {"method": "pearson"}),
+    ("corr spearman", "corr", {"method": "spearman"}),
+    ("corr Age Salary", "corr_pair", {"c1": "Age", "c2": "Salary", "method": "pearson"}),
+    ("correlation Age Salary spearman", "corr_pair", {"c1": "Age", "c2": "Salary", "method": "spearman"}),
+])
+def test_correlation_routing(text, command, args):
+    intent = parse_command(text)
+    assert intent["kind"] == "action"
+    assert intent["command"] == command
+    assert intent["args"] == args
+
+
+@pytest.mark.parametrize("text", ["corr Age", "corr Age Salary kendall", "corr a b c d", "compare Age"])
+def test_correlation_usage_hints(text):
+    intent = parse_command(text)
+    assert intent["kind"] == "text"
+    assert "Usage" in intent["content"]
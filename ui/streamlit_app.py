@@ -23,6 +23,9 @@ from core.analytics import (
     detect_outliers,
     auto_insights,
     compare_columns,
+    compare_all,
+    correlation_matrix,
+    correlate_pair,
 )
 from core.visualizer import auto_plot, histogram
 
@@ -114,6 +117,9 @@ st.sidebar.markdown("""
 - `groupby <col> <agg> <col>` - Group & aggregate
 - `outliers <column>` - Detect outliers
 - `compare <col1> <col2>` - Compare columns
+- `compare all` - Rank all related column pairs
+- `corr [spearman]` - Correlation matrix
+- `corr <col1> <col2>` - Correlation of a pair
 
 **📈 Visuals**
 - `plot <x> <y>` - Bar chart
@@ -129,9 +135,12 @@ st.sidebar.markdown("""
 # Load CSV (SAFE & CORRECT)
 # -------------------------
 df = None
+dataset_key = None
 
 if uploaded:
     df = pd.read_csv(uploaded)
+    # Cheap identity for this upload, used to cache correlation matrices across reruns
+    dataset_key = (uploaded.file_id, df.shape)
 
     # CASE 1: User selected a saved chat and now uploads its CSV
     if st.session_state.selected_chat and st.session_state.selected_chat == uploaded.name:
@@ -249,6 +258,17 @@ elif df is not None:
                     st.dataframe(detect_outliers(df, args["column"]))
                 elif cmd == "compare":
                     st.json(compare_columns(df, args["c1"], args["c2"]))
+                elif cmd in ("compare_all", "corr", "corr_pair"):
+                    try:
+                        method = args.get("method", "pearson")
+                        if cmd == "compare_all":
+                            st.dataframe(compare_all(df, method, key=dataset_key))
+                        elif cmd == "corr":
+                            st.dataframe(correlation_matrix(df, method, key=dataset_key).round(4))
+                        else:
+                            st.json(correlate_pair(df, args["c1"], args["c2"], method, key=dataset_key))
+                    except ValueError as e:
+                        st.error(str(e))
                 elif cmd == "insights":
                     for insight in auto_insights(df):
                         st.markdown(f"- {insight}")